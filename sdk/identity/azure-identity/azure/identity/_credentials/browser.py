@@ -2,8 +2,9 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 # ------------------------------------
-import platform
+import os
 import socket
+import sys
 from typing import Dict, Any
 import subprocess
 import webbrowser
@@ -15,6 +16,23 @@ from .. import CredentialUnavailableError
 from .._constants import DEVELOPER_SIGN_ON_CLIENT_ID
 from .._internal import AuthCodeRedirectServer, InteractiveCredential, wrap_exceptions, within_dac
 
+# the redirect server binds this address rather than "localhost" so starting it doesn't require a name lookup
+_LOOPBACK_ADDRESS = "127.0.0.1"
+
+# The host OS can't change while the process runs, so detect WSL once rather than on every browser launch. This avoids
+# platform.uname(), which on Python < 3.9 runs "uname -p" in a subprocess.
+_IS_WSL = sys.platform.startswith("linux") and "microsoft" in os.uname().release.lower()
+_PS_CMD = ["powershell.exe", "-NoProfile", "-Command"]
+
+# Without a display there's usually no browser to open, and having webbrowser try every browser it knows is slow.
+# A user who sets BROWSER has told webbrowser what to run, so we try that regardless.
+_HAS_DISPLAY = bool(
+    os.environ.get("BROWSER")
+    or os.environ.get("DISPLAY")
+    or os.environ.get("WAYLAND_DISPLAY")
+    or sys.platform in ("win32", "darwin")
+)
+
 
 class InteractiveBrowserCredential(InteractiveCredential):
     """Opens a browser to interactively authenticate a user.
@@ -72,8 +90,11 @@ class InteractiveBrowserCredential(InteractiveCredential):
             self._parsed_url = urlparse(redirect_uri)
             if not (self._parsed_url.hostname and self._parsed_url.port):
                 raise ValueError('"redirect_uri" must be a URL with port number, for example "http://localhost:8400"')
+            hostname = self._parsed_url.hostname
+            self._server_hostname = _LOOPBACK_ADDRESS if hostname.lower() == "localhost" else hostname
         else:
             self._parsed_url = None
+            self._server_hostname = _LOOPBACK_ADDRESS
 
         self._login_hint = kwargs.pop("login_hint", None)
         self._timeout = kwargs.pop("timeout", 300)
@@ -85,28 +106,26 @@ class InteractiveBrowserCredential(InteractiveCredential):
     def _request_token(self, *scopes: str, **kwargs) -> Dict:
 
         # start an HTTP server to receive the redirect
-        server = None
         redirect_uri: str = ""
         if self._parsed_url:
             try:
-                redirect_uri = "http://{}:{}".format(self._parsed_url.hostname, self._parsed_url.port)
-                server = self._server_class(self._parsed_url.hostname, self._parsed_url.port, timeout=self._timeout)
+                hostname = self._parsed_url.hostname
+                if ":" in hostname:
+                    hostname = "[{}]".format(hostname)  # an IPv6 address must be bracketed in a URL
+                redirect_uri = "http://{}:{}".format(hostname, self._parsed_url.port)
+                server = self._server_class(self._server_hostname, self._parsed_url.port, timeout=self._timeout)
             except socket.error as ex:
                 raise CredentialUnavailableError(message="Couldn't start an HTTP server on " + redirect_uri) from ex
         else:
-            for port in range(8400, 9000):
-                try:
-                    server = self._server_class("localhost", port, timeout=self._timeout)
-                    redirect_uri = "http://localhost:{}".format(port)
-                    break
-                except socket.error:
-                    continue  # keep looking for an open port
-
-        if not server:
-            raise CredentialUnavailableError(message="Couldn't start an HTTP server on localhost")
-
-        # get the url the user must visit to authenticate
-        scopes = list(scopes)  # type: ignore
+            try:
+                # port 0 has the OS assign a free ephemeral port, so there's no need to probe for an open one
+                server = self._server_class(self._server_hostname, 0, timeout=self._timeout)
+                # the redirect URI keeps "localhost" because that's what the default client's registration allows
+                redirect_uri = "http://localhost:{}".format(server.server_port)
+            except socket.error as ex:
+                raise CredentialUnavailableError(message="Couldn't start an HTTP server on localhost") from ex
+
+        # get the url the user must visit to authenticate (MSAL accepts scopes as a tuple)
         claims = kwargs.get("claims")
         app = self._get_app(**kwargs)
         flow = app.initiate_auth_code_flow(
@@ -125,33 +144,27 @@ class InteractiveBrowserCredential(InteractiveCredential):
         # block until the server times out or receives the post-authentication redirect
         response = server.wait_for_redirect()
         if not response:
+            message = "Timed out after waiting {} seconds for the user to authenticate".format(self._timeout)
             if within_dac.get():
-                raise CredentialUnavailableError(
-                    message="Timed out after waiting {} seconds for the user to authenticate".format(self._timeout)
-                )
-            raise ClientAuthenticationError(
-                message="Timed out after waiting {} seconds for the user to authenticate".format(self._timeout)
-            )
+                raise CredentialUnavailableError(message=message)
+            raise ClientAuthenticationError(message=message)
 
         # redeem the authorization code for a token
         return app.acquire_token_by_auth_code_flow(flow, response, scopes=scopes, claims_challenge=claims)
 
 
 def _open_browser(url):
-    opened = webbrowser.open(url)
-    if not opened:
-        uname = platform.uname()
-        system = uname[0].lower()
-        release = uname[2].lower()
-        if "microsoft" in release and system == "linux":
-            kwargs = {"timeout": 5}
+    if not (_HAS_DISPLAY or _IS_WSL):
+        return False
 
-            try:
-                exit_code = subprocess.call(
-                    ["powershell.exe", "-NoProfile", "-Command", 'Start-Process "{}"'.format(url)], **kwargs
-                )
-                opened = exit_code == 0
-            except Exception:  # pylint:disable=broad-except
-                # powershell.exe isn't available, or the subprocess timed out
-                pass
+    opened = webbrowser.open(url)
+    if not opened and _IS_WSL:
+        kwargs = {"timeout": 5}
+
+        try:
+            exit_code = subprocess.call(_PS_CMD + ['Start-Process "{}"'.format(url)], **kwargs)
+            opened = exit_code == 0
+        except Exception:  # pylint:disable=broad-except
+            # powershell.exe isn't available, or the subprocess timed out
+            pass
     return opened
@@ -2,7 +2,7 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 # ------------------------------------
-from datetime import datetime
+from datetime import datetime, timezone
 import time
 from typing import Dict, Optional, Callable, Any
 
@@ -40,7 +40,8 @@ class DeviceCodeCredential(InteractiveCredential):
 
         - ``verification_uri`` (str) the URL the user must visit
         - ``user_code`` (str) the code the user must enter there
-        - ``expires_on`` (datetime.datetime) the UTC time at which the code will expire
+        - ``expires_on`` (datetime.datetime) the time at which the code will expire, as a timezone-aware datetime
+          in UTC
 
         If this argument isn't provided, the credential will print instructions to stdout.
     :paramtype prompt_callback: Callable[str, str, ~datetime.datetime]
@@ -85,9 +86,7 @@ class DeviceCodeCredential(InteractiveCredential):
 
     @wrap_exceptions
     def _request_token(self, *scopes: str, **kwargs: Any) -> Dict:
-        # MSAL requires scopes be a list
-        scopes = list(scopes)  # type: ignore
-
+        # MSAL accepts scopes as a tuple, so there's no need to copy them into a list
         app = self._get_app(**kwargs)
         flow = app.initiate_device_flow(scopes)
         if "error" in flow:
@@ -97,16 +96,17 @@ class DeviceCodeCredential(InteractiveCredential):
 
         if self._prompt_callback:
             self._prompt_callback(
-                flow["verification_uri"], flow["user_code"], datetime.utcfromtimestamp(flow["expires_at"])
+                flow["verification_uri"], flow["user_code"], datetime.fromtimestamp(flow["expires_at"], timezone.utc)
             )
         else:
             print(flow["message"])
 
         if self._timeout is not None and self._timeout < flow["expires_in"]:
             # user specified an effective timeout we will observe
-            deadline = int(time.time()) + self._timeout
+            # a monotonic clock keeps the deadline true should the system clock change while MSAL polls
+            deadline = time.monotonic() + self._timeout
             result = app.acquire_token_by_device_flow(
-                flow, exit_condition=lambda flow: time.time() > deadline, claims_challenge=kwargs.get("claims")
+                flow, exit_condition=lambda flow: time.monotonic() > deadline, claims_challenge=kwargs.get("claims")
             )
         else:
             # MSAL will stop polling when the device code expires
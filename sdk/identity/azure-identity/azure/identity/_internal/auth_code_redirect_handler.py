@@ -2,17 +2,29 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 # ------------------------------------
+import selectors
+import socket
+import time
 from typing import Any, Mapping
 
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import parse_qs
 
+# like socketserver, prefer poll to select where it's available; either is lighter than epoll for a single socket
+if hasattr(selectors, "PollSelector"):
+    _ServerSelector = selectors.PollSelector  # type: Any
+else:
+    _ServerSelector = selectors.SelectSelector
+
 
 class AuthCodeRedirectHandler(BaseHTTPRequestHandler):
     """HTTP request handler to capture the authentication server's response.
     Mostly from the Azure CLI: https://github.com/Azure/azure-cli/blob/dev/src/azure-cli-core/azure/cli/core/_profile.py
     """
 
+    # the response is written unbuffered in several small sends, which Nagle's algorithm would delay
+    disable_nagle_algorithm = True
+
     def do_GET(self):
         if self.path.endswith("/favicon.ico"):  # deal with legacy IE
             self.send_response(204)
@@ -39,24 +51,34 @@ class AuthCodeRedirectServer(HTTPServer):
 
     def __init__(self, hostname, port, timeout):
         # type: (str, int, int) -> None
+        if ":" in hostname:
+            # an IPv6 address such as "::1" requires an IPv6 socket
+            self.address_family = socket.AF_INET6
+        # SO_REUSEADDR only helps rebind a port lingering in TIME_WAIT, which a port assigned by the OS never is
+        self.allow_reuse_address = port != 0
         HTTPServer.__init__(self, (hostname, port), AuthCodeRedirectHandler)
         self.timeout = timeout
 
     def wait_for_redirect(self):
         # type: () -> Mapping[str, Any]
-        while not self.query_params:
-            try:
-                self.handle_request()
-            except (IOError, ValueError):
-                # socket has been closed, probably by handle_timeout
-                break
+        # Sleep in the kernel until the browser connects. The timeout bounds the entire wait, rather than restarting
+        # with each request (for example, a favicon request) which doesn't carry the redirect.
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        try:
+            with _ServerSelector() as selector:
+                selector.register(self, selectors.EVENT_READ)
+                while not self.query_params:
+                    remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+                    if not selector.select(remaining):
+                        break  # timed out
+                    self._handle_request_noblock()  # type: ignore
+        except OSError:
+            # select() failed, so the listening socket is unusable. _handle_request_noblock handles its own accept()
+            # errors, and request handling errors go to handle_error, so nothing else raises here.
+            pass
 
         # ensure the underlying socket is closed (a no-op when the socket is already closed)
         self.server_close()
 
         # if we timed out, this returns an empty dict
         return self.query_params
-
-    def handle_timeout(self):
-        """Break the request-handling loop by tearing down the server"""
-        self.server_close()
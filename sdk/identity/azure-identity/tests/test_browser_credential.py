@@ -3,16 +3,16 @@
 # Licensed under the MIT License.
 # ------------------------------------
 import platform
-import random
 import socket
 import threading
-import time
 import urllib
 from azure.core.exceptions import ClientAuthenticationError
 from azure.core.pipeline.policies import SansIOHTTPPolicy
 from azure.core.pipeline.transport import RequestsTransport
 from azure.identity import AuthenticationRequiredError, CredentialUnavailableError, InteractiveBrowserCredential
+from azure.identity._credentials.browser import _open_browser
 from azure.identity._internal import AuthCodeRedirectServer
+from azure.identity._internal.auth_code_redirect_handler import AuthCodeRedirectHandler
 from azure.identity._internal.user_agent import USER_AGENT
 import pytest
 from unittest.mock import ANY, Mock, patch
@@ -29,6 +29,7 @@ from helpers import (
 
 
 WEBBROWSER_OPEN = InteractiveBrowserCredential.__module__ + ".webbrowser.open"
+HAS_DISPLAY = InteractiveBrowserCredential.__module__ + "._HAS_DISPLAY"
 
 
 @pytest.mark.manual
@@ -115,11 +116,6 @@ def test_timeout():
 
     timeout = 0.01
 
-    class GuaranteedTimeout(AuthCodeRedirectServer, object):
-        def handle_request(self):
-            time.sleep(timeout + 0.01)
-            super(GuaranteedTimeout, self).handle_request()
-
     # mock transport handles MSAL's tenant discovery
     transport = Mock(
         send=lambda _, **__: mock_response(
@@ -128,28 +124,21 @@ def test_timeout():
     )
 
     credential = InteractiveBrowserCredential(
-        timeout=timeout, transport=transport, _server_class=GuaranteedTimeout, client_credential="client_credential"
+        timeout=timeout, transport=transport, client_credential="client_credential"
     )
 
-    with patch(WEBBROWSER_OPEN, lambda _: True):
+    with patch(WEBBROWSER_OPEN, lambda _: True), patch(HAS_DISPLAY, True):
         with pytest.raises(ClientAuthenticationError) as ex:
             credential.get_token("scope")
     assert "timed out" in ex.value.message.lower()
 
 
 def test_redirect_server():
-    # binding a random port prevents races when running the test in parallel
-    server = None
+    # binding port 0 has the OS choose a free port, preventing races when running the test in parallel
     hostname = "127.0.0.1"
-    for _ in range(4):
-        try:
-            port = random.randint(1024, 65535)
-            server = AuthCodeRedirectServer(hostname, port, timeout=10)
-            break
-        except socket.error:
-            continue  # keep looking for an open port
-
-    assert server, "failed to start redirect server"
+    server = AuthCodeRedirectServer(hostname, 0, timeout=10)
+    port = server.server_port
+    assert port
 
     expected_param = "expected-param"
     expected_value = "expected-value"
@@ -167,6 +156,38 @@ def test_redirect_server():
     assert server.query_params[expected_param] == expected_value
 
 
+def test_redirect_handler_disables_nagle():
+    """The redirect handler should set TCP_NODELAY on each connection it handles"""
+
+    connection = Mock()
+    with patch.object(AuthCodeRedirectHandler, "handle"):
+        AuthCodeRedirectHandler(connection, ("127.0.0.1", 42), Mock())
+    connection.setsockopt.assert_any_call(socket.IPPROTO_TCP, socket.TCP_NODELAY, True)
+
+
+@pytest.mark.skipif(not socket.has_ipv6, reason="this platform doesn't support IPv6")
+def test_redirect_server_ipv6():
+    """The server should listen on an IPv6 socket when given an IPv6 address"""
+
+    server = AuthCodeRedirectServer("::1", 0, timeout=10)
+    try:
+        assert server.socket.family == socket.AF_INET6
+        assert server.server_port
+    finally:
+        server.server_close()
+
+
+def test_redirect_server_ephemeral_port():
+    """The server shouldn't set SO_REUSEADDR when the OS assigns its port"""
+
+    server = AuthCodeRedirectServer("127.0.0.1", 0, timeout=10)
+    try:
+        assert server.server_port
+        assert not server.socket.getsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR)
+    finally:
+        server.server_close()
+
+
 def test_no_browser():
     """The credential should raise CredentialUnavailableError when it can't open a browser"""
 
@@ -179,6 +200,34 @@ def test_no_browser():
             credential.get_token("scope")
 
 
+@pytest.mark.parametrize("is_wsl", (True, False))
+def test_open_browser_wsl_fallback(is_wsl):
+    """When webbrowser can't open a browser, _open_browser should try powershell.exe only on WSL"""
+
+    module = InteractiveBrowserCredential.__module__
+    url = "https://localhost/auth"
+    call = Mock(return_value=0)
+    with patch(WEBBROWSER_OPEN, lambda _: False), patch(HAS_DISPLAY, True):
+        with patch(module + "._IS_WSL", is_wsl):
+            with patch(module + ".subprocess.call", call):
+                assert _open_browser(url) == is_wsl
+
+    if is_wsl:
+        args, _ = call.call_args
+        assert args[0] == ["powershell.exe", "-NoProfile", "-Command", 'Start-Process "{}"'.format(url)]
+    else:
+        assert not call.called
+
+
+def test_open_browser_no_display():
+    """_open_browser shouldn't try webbrowser when there's no display to open a browser on"""
+
+    module = InteractiveBrowserCredential.__module__
+    with patch(WEBBROWSER_OPEN, Mock(side_effect=Exception("_open_browser shouldn't try webbrowser"))):
+        with patch(HAS_DISPLAY, False), patch(module + "._IS_WSL", False):
+            assert not _open_browser("https://localhost/auth")
+
+
 def test_redirect_uri():
     """The credential should configure the redirect server to use a given redirect_uri"""
 
@@ -195,7 +244,31 @@ def test_redirect_uri():
         credential.get_token("scope")
 
     assert expected_message in ex.value.message
-    server.assert_called_once_with(expected_hostname, expected_port, timeout=ANY)
+    # the server should bind the loopback address rather than resolve "localhost"
+    server.assert_called_once_with("127.0.0.1", expected_port, timeout=ANY)
+
+
+def test_ipv6_redirect_uri():
+    """The credential should bind an IPv6 redirect_uri's address and send Entra ID a well-formed redirect URI"""
+
+    transport = validating_transport(requests=[Request()] * 2, responses=[get_discovery_response()] * 2)
+    server = Mock(server_port=42)
+    credential = InteractiveBrowserCredential(
+        client_id="client-id",
+        redirect_uri="http://[::1]:42",
+        _server_class=server,
+        transport=transport,
+        client_credential="client_credential",
+    )
+    open_browser = Mock(return_value=False)
+    with patch(InteractiveBrowserCredential.__module__ + "._open_browser", open_browser):
+        with pytest.raises(CredentialUnavailableError):
+            credential.get_token("scope")
+
+    server.assert_called_once_with("::1", 42, timeout=ANY)
+    auth_uri = open_browser.call_args[0][0]
+    query = urllib.parse.parse_qs(urllib.parse.urlparse(auth_uri).query)
+    assert query["redirect_uri"] == ["http://[::1]:42"]
 
 
 @pytest.mark.parametrize("redirect_uri", ("http://localhost", "host", "host:42"))
@@ -209,12 +282,14 @@ def test_invalid_redirect_uri(redirect_uri):
 def test_cannot_bind_port():
     """get_token should raise CredentialUnavailableError when the redirect listener can't bind a port"""
 
-    credential = InteractiveBrowserCredential(
-        _server_class=Mock(side_effect=socket.error), client_credential="client_credential"
-    )
+    server = Mock(side_effect=socket.error)
+    credential = InteractiveBrowserCredential(_server_class=server, client_credential="client_credential")
     with pytest.raises(CredentialUnavailableError):
         credential.get_token("scope")
 
+    # the credential should ask the OS for a port rather than probing a range of them
+    server.assert_called_once_with("127.0.0.1", 0, timeout=ANY)
+
 
 def test_cannot_bind_redirect_uri():
     """When a user specifies a redirect URI, the credential shouldn't attempt to bind another"""
@@ -227,4 +302,4 @@ def test_cannot_bind_redirect_uri():
     with pytest.raises(CredentialUnavailableError):
         credential.get_token("scope")
 
-    server.assert_called_once_with("localhost", 42, timeout=ANY)
+    server.assert_called_once_with("127.0.0.1", 42, timeout=ANY)
@@ -3,6 +3,7 @@
 # Licensed under the MIT License.
 # ------------------------------------
 import datetime
+import time
 from unittest.mock import ANY, Mock, patch
 
 from azure.core.exceptions import ClientAuthenticationError
@@ -209,7 +210,7 @@ def test_device_code_credential():
         disable_instance_discovery=True,
     )
 
-    now = datetime.datetime.utcnow()
+    now = datetime.datetime.now(datetime.timezone.utc)
     token = credential.get_token("scope")
     assert token.token == expected_token
 
@@ -223,6 +224,7 @@ def test_device_code_credential():
     # patching time, so we'll be satisfied if expires_on is a datetime at least expires_in
     # seconds later than our call to get_token
     assert isinstance(expires_on, datetime.datetime)
+    assert expires_on.tzinfo == datetime.timezone.utc
     assert expires_on - now >= datetime.timedelta(seconds=expires_in)
 
 
@@ -269,7 +271,7 @@ def test_tenant_id():
         additionally_allowed_tenants=["*"],
     )
 
-    now = datetime.datetime.utcnow()
+    now = datetime.datetime.now(datetime.timezone.utc)
     token = credential.get_token("scope", tenant_id="tenant_id")
     assert token.token == expected_token
 
@@ -282,11 +284,21 @@ def test_timeout():
         msal_app.acquire_token_by_device_flow.return_value = {"error": "authorization_pending"}
 
         credential = DeviceCodeCredential(client_id="_", timeout=1, disable_instance_discovery=True)
-        with pytest.raises(ClientAuthenticationError) as ex:
-            credential.get_token("scope")
+        now = time.monotonic()
+        with patch(DeviceCodeCredential.__module__ + ".time.monotonic", lambda: now):
+            with pytest.raises(ClientAuthenticationError) as ex:
+                credential.get_token("scope")
         assert "timed out" in ex.value.message.lower()
         msal_app.acquire_token_by_device_flow.assert_called_once_with(flow, exit_condition=ANY, claims_challenge=None)
 
+        # the deadline should be measured with a monotonic clock, unaffected by changes to the system clock
+        _, kwargs = msal_app.acquire_token_by_device_flow.call_args
+        exit_condition = kwargs["exit_condition"]
+        with patch(DeviceCodeCredential.__module__ + ".time.monotonic", lambda: now + 0.5):
+            assert not exit_condition(flow)
+        with patch(DeviceCodeCredential.__module__ + ".time.monotonic", lambda: now + 2):
+            assert exit_condition(flow)
+
 
 def test_client_capabilities():
     """the credential should configure MSAL for capability CP1 only if enable_cae is passed."""